@@ -11,23 +11,106 @@ Usage:
 """
 
 import os
+import re
+import argparse
 import sys
 import zipfile
 import shutil
 import subprocess
+import threading
+import multiprocessing
 from pathlib import Path
+import PIL
 from PIL import Image, ImageOps, ImageDraw, ImageFont
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 import time
+from io import BytesIO
 
 
 # Configuration
 TARGET_WIDTH = 480
 TARGET_HEIGHT = 800
 
+# Big downscales first shrink by an integer factor with a fast box reduce(),
+# leaving at least this much scaling for the LANCZOS pass (see Image.resize)
+REDUCING_GAP = 3.0
+
 # Global flag for dithering (default True)
 USE_DITHERING = True
 
+# zlib level for the temp PNGs: fast by default, uncompressed with --clean
+# since they are deleted right after conversion anyway (XTC output is unaffected).
+PNG_COMPRESS_LEVEL = 1
+
+# Thumbnail highlight: white blended over the active region at this opacity (0-255)
+THUMBNAIL_HIGHLIGHT_OPACITY = 96
+HIGHLIGHT_LUT = [(255 * THUMBNAIL_HIGHLIGHT_OPACITY + v * (255 - THUMBNAIL_HIGHLIGHT_OPACITY) + 127) // 255 for v in range(256)]
+
+# Most pages a single CBZ may have queued for the page workers at once
+MAX_PAGES_IN_FLIGHT = 16
+
+# Seconds png2xtc gets to convert one book
+PNG2XTC_TIMEOUT = 300
+
+# Module-level settings that main() fills in from the command line.
+# Page workers run in separate processes, so these are copied into each one.
+SETTING_NAMES = (
+    'USE_DITHERING', 'OVERLAP', 'THUMBNAIL_WIDTH', 'THUMBNAIL_HIGHLIGHT_ACTIVE',
+    'SPLIT_SPREADS', 'SPLIT_SPREADS_PAGES', 'SPLIT_ALL', 'SKIP_ON', 'SKIP_PAGES',
+    'ONLY_ON', 'ONLY_PAGES', 'DONT_SPLIT', 'DONT_SPLIT_PAGES', 'CONTRAST_BOOST',
+    'CONTRAST_LEVELS', 'MARGIN', 'MARGIN_VALUE', 'INCLUDE_OVERVIEWS',
+    'SIDEWAYS_OVERVIEWS', 'SELECT_OVERVIEWS', 'SELECT_OV_PAGES', 'START_PAGE',
+    'STOP_PAGE', 'DESIRED_V_OVERLAP_SEGMENTS', 'SET_H_OVERLAP_SEGMENTS',
+    'MINIMUM_V_OVERLAP_PERCENT', 'SET_H_OVERLAP_PERCENT', 'MAX_SPLIT_WIDTH',
+    'IS_MANGA', 'SAMPLE_SET', 'SAMPLE_PAGES', 'SPECIAL_SPLITS',
+    'SPECIAL_CONTRASTS', 'PADDING_COLOR', 'PNG_COMPRESS_LEVEL',
+    'FIXED_CONTRAST_LUT',
+)
+
+# Held while writing to the console, so lines from parallel books don't interleave
+_print_lock = threading.Lock()
+
+# Per-thread scratch state (reusable output canvas)
+_thread_state = threading.local()
+
+# Font for the --sample-set labels, loaded on first use (see get_sample_font)
+_sample_font = None
+
+
+def current_settings():
+    """
+    Snapshot the command line settings as a dict (to hand to page workers)
+    """
+    return {name: globals()[name] for name in SETTING_NAMES}
+
+
+def apply_settings(settings):
+    """
+    Install settings from current_settings() (page worker initializer)
+    """
+    globals().update(settings)
+
+
+def usable_cpu_count():
+    """
+    Number of CPUs this process may actually run on
+    Honours taskset/container CPU sets where the OS exposes them, unlike os.cpu_count().
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def report(*lines):
+    """
+    Print progress lines for one book in a single locked write
+    Book threads run in parallel, so a plain print() could land mid-line of another book's output.
+    """
+    text = "\n".join(lines) + "\n"
+    with _print_lock:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+
 
 def find_png2xtc():
     """
@@ -60,7 +143,60 @@ def find_png2xtc():
     return None
 
 
-def optimize_image(img_data, output_path_base, page_num, suffix=""):
+def optimize_image(img_data, output_path_base, page_num):
+    """
+    Optimize one page for the XTEink X4 and save its PNGs (see optimize_piece).
+    img_data is the raw image file bytes.
+    The page is decoded once; a split spread queues its halves as further
+    pieces of the same image instead of recursing.
+    Returns the total size of the PNGs written.
+    """
+    try:
+        source_img = Image.open(BytesIO(img_data))
+    except Exception as e:
+        print(f"    Warning: Could not optimize image: {e}")
+        return 0
+
+    total_size = 0
+    pieces = [""]
+    while pieces:
+        suffix = pieces.pop()
+        size, halves = optimize_piece(source_img, output_path_base, page_num, suffix)
+        total_size += size
+        pieces.extend(reversed(halves))  # first half next, same order as before
+    return total_size
+
+
+def page_wanted(page_num):
+    """
+    Check the page filters (--skip, --start, --stop, --only, --sample-set)
+    Runs before the page is read from the zip, so filtered pages cost nothing.
+    """
+    if SKIP_ON:
+        if str(page_num) in SKIP_PAGES: 
+            report(f"  skipping page: {page_num}")
+            return False
+
+    if START_PAGE and page_num < START_PAGE:
+        # we haven't reached the start page yet
+        return False
+
+    if STOP_PAGE and page_num > STOP_PAGE:
+        # we've passed the stop page.
+        return False
+
+    if ONLY_ON:
+        if str(page_num) not in ONLY_PAGES: 
+            return False
+
+    if SAMPLE_SET and str(page_num) not in SAMPLE_PAGES:
+        # only the sample pages produce anything
+        return False
+
+    return True
+
+
+def optimize_piece(source_img, output_path_base, page_num, suffix=""):
     """
     Optimize image for XTEink X4:
     - crop off image margins (if active)
@@ -70,10 +206,11 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
     - Resize to fit 480x800 with white padding
     - Convert to grayscale
     - Save as PNG (for XTC conversion)
+    suffix ".1"/".2" picks a half of a split spread out of source_img.
+    Returns (size of the PNGs written, suffixes of halves still to do).
     """
     try:
-        from io import BytesIO
-        uncropped_img = Image.open(BytesIO(img_data))
+        uncropped_img = source_img
 
         if IS_MANGA:
             if suffix == ".1":
@@ -94,28 +231,11 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
                 width, height = uncropped_img.size
                 uncropped_img = uncropped_img.crop((int(50/100.0*width), int(0/100.0*height), width-int(0/100.0*width), height-int(0/100.0*height)))
 
-        if SKIP_ON:
-            if str(page_num) in SKIP_PAGES: 
-                print("skipping page:",page_num)
-                return 0
-
-        if START_PAGE and page_num < START_PAGE:
-            # we haven't reached the start page yet
-            return 0
-
-        if STOP_PAGE and page_num > STOP_PAGE:
-            # we've passed the stop page.
-            return 0
-
-        if ONLY_ON:
-            if str(page_num) not in ONLY_PAGES: 
-                return 0
-
         if SAMPLE_SET:
             if str(page_num) in SAMPLE_PAGES:
                 if uncropped_img.mode != 'L':
                     uncropped_img = uncropped_img.convert('L')
-                font = ImageFont.load_default(size=100)
+                font = get_sample_font()
                 text_color = 0
                 box_color = 255
                 print("creating samples for page:",page_num)
@@ -130,19 +250,19 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
                 while contrast_set < 9:
                     black_cutoff = 3 * contrast_set
                     white_cutoff = 3 + 9 * contrast_set
-                    page_view = ImageOps.autocontrast(uncropped_img, cutoff=(black_cutoff,white_cutoff), preserve_tone=True)
+                    page_view = ImageOps.autocontrast(uncropped_img, cutoff=(black_cutoff,white_cutoff))
                     draw = ImageDraw.Draw(page_view)
                     draw.rounded_rectangle(box_position, radius=60, fill=box_color, outline=text_color, width=6, corners=(False,True,False,True))
                     draw.text(text_position, f"Contrast {contrast_set}", fill=text_color, font=font)
                     output_page = output_path_base.parent / f"{page_num:04d}_0_contrast{contrast_set}.png"
                     save_with_padding(page_view, output_page, padcolor=PADDING_COLOR)
                     middle_third = page_view.crop((0, shiftdown_to_overlap, width, height - shiftdown_to_overlap))
-                    middle_rotated = middle_third.rotate(-90, expand=True)
+                    middle_rotated = middle_third.transpose(Image.Transpose.ROTATE_270)
                     output_middle = output_path_base.parent / f"{page_num:04d}_3_b_contrast{contrast_set}.png"
                     save_with_padding(middle_rotated, output_middle, padcolor=PADDING_COLOR)
                     contrast_set += 1
                 crop_set = 0.0
-                contrast3img = ImageOps.autocontrast(uncropped_img, cutoff=(9,30), preserve_tone=True)
+                contrast3img = ImageOps.autocontrast(uncropped_img, cutoff=(9,30))
                 while crop_set < 10:
                     allaroundcrop = crop_set
                     page_view = contrast3img.crop((int(allaroundcrop/100.0*width), int(allaroundcrop/100.0*height), width-int(allaroundcrop/100.0*width), height-int(allaroundcrop/100.0*height)))
@@ -155,51 +275,46 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
             else:
                 pass
                 # print("skipping page:",page_num)
-            return 0
+            return 0, []
+
+        # Convert to grayscale first, so the contrast stretch works on a single channel
+        color_img = uncropped_img
+        if uncropped_img.mode != 'L':
+            uncropped_img = uncropped_img.convert('L')
 
         need_boost = CONTRAST_BOOST
-        contrast_black = 0
-        contrast_white = 0
-        if CONTRAST_VALUE and len(CONTRAST_VALUE.split(',')) > 1:
-            contrast_black = int(CONTRAST_VALUE.split(',')[0])
-            contrast_white = int(CONTRAST_VALUE.split(',')[1])
-        elif CONTRAST_VALUE:
-            contrast_black = int(CONTRAST_VALUE)
-            contrast_white = int(CONTRAST_VALUE)
-        else:
-            contrast_black = 0
-            contrast_white = 0
-        if SPECIAL_CONTRASTS and page_num in SPECIAL_CONTRAST_PAGES:
+        contrast_black, contrast_white = CONTRAST_LEVELS
+        if page_num in SPECIAL_CONTRASTS:
             need_boost = True
-            special_contrast_pos = SPECIAL_CONTRAST_PAGES.index(page_num)
-            contrast_black = SPECIAL_CONTRAST_DARKS[special_contrast_pos]
-            contrast_white = SPECIAL_CONTRAST_LIGHTS[special_contrast_pos]
+            contrast_black, contrast_white = SPECIAL_CONTRASTS[page_num]
         #enhance contrast
-        if need_boost:
+        stretch_cutoff = None
+        if FIXED_CONTRAST_LUT and page_num not in SPECIAL_CONTRASTS:
+            # --contrast-fixed: same levels for every page, so no per-page histogram.
+            uncropped_img = uncropped_img.point(FIXED_CONTRAST_LUT)
+        elif need_boost:
             if contrast_black == 0 and contrast_white == 0:
                 pass  # we don't need to adjust contrast at all.
             elif contrast_black != contrast_white:
                 #passed a list of 2, first is dark cutoff, second is bright cutoff.
                 black_cutoff = 3 * contrast_black
                 white_cutoff = 3 + 9 * contrast_white
-                uncropped_img = ImageOps.autocontrast(uncropped_img, cutoff=(black_cutoff,white_cutoff), preserve_tone=True)
+                stretch_cutoff = (black_cutoff,white_cutoff)
             elif int(contrast_black) < 0 or int(contrast_black) > 8:
                 pass # value out of range. we'll treat like 0.
             else:
                 black_cutoff = 3 * contrast_black
                 white_cutoff = 3 + 9 * contrast_white
-                uncropped_img = ImageOps.autocontrast(uncropped_img, cutoff=(black_cutoff,white_cutoff), preserve_tone=True)
+                stretch_cutoff = (black_cutoff,white_cutoff)
         else:
             # nothing set, so we go with the default value of 4. 
             black_cutoff = 3 * 4    # default, contrast level 4 = 12
             white_cutoff = 3 + 9 * 4    # default, contrast level 4 = 39
-            uncropped_img = ImageOps.autocontrast(uncropped_img, cutoff=(black_cutoff,white_cutoff), preserve_tone=True)
-            # uncropped_img = ImageOps.autocontrast(uncropped_img, cutoff=(8,35), preserve_tone=True)
+            stretch_cutoff = (black_cutoff,white_cutoff)
+            # stretch_cutoff = (8,35)
+        if stretch_cutoff:
+            uncropped_img = ImageOps.autocontrast(uncropped_img, cutoff=stretch_cutoff)
 
-        # Convert to grayscale
-        if uncropped_img.mode != 'L':
-            uncropped_img = uncropped_img.convert('L')
-        
         img = uncropped_img
         width, height = img.size
 
@@ -209,10 +324,13 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
                 pass #we don't need to do margins at all.
             elif MARGIN_VALUE.lower() == "auto":
                 # trim white space from all four sides.
-                invert_img=ImageOps.invert(uncropped_img) #invert image
-                invert_img=ImageOps.autocontrast(invert_img,cutoff=(59,40))
-                image_box_coords = invert_img.getbbox() # bounding rect around anything not true black.
-                img = uncropped_img.crop(image_box_coords)
+                bbox_img = uncropped_img
+                if stretch_cutoff and color_img.mode == 'RGB':
+                    # Find the box the way it always was, stretching the color page before
+                    # going gray. The gray-first stretch is fine to look at, but it moves
+                    # the box by tens of pixels on real pages.
+                    bbox_img = ImageOps.autocontrast(color_img, cutoff=stretch_cutoff, preserve_tone=True).convert('L')
+                img = uncropped_img.crop(content_bbox(bbox_img))
             elif len(MARGIN_VALUE.split(',')) > 1:
                 marginlist = MARGIN_VALUE.split(',')
                 marginlist.append("0")
@@ -229,28 +347,32 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
         width, height = img.size
         half_height = height // 2
         total_size = 0
+        halves = []
 
         should_this_split = width < height  #we split most pages that are vertical.
         if str(page_num) in SPLIT_SPREADS_PAGES:
             if suffix == "":  
-                # we haven't recursed, this is top level.
-                should_this_split = False  #we're not splitting this vertically, we're halving it, then the halves will be split recursively.
+                # this is the whole page, not one of its halves.
+                should_this_split = False  #we're not splitting this vertically, we're halving it, then the halves will be split as pieces of their own.
             else:
-                # we have recursed.
-                should_this_split = True  #we can't recurse again, it's been halved, it must be split.
+                # this is one of the halves.
+                should_this_split = True  #we can't halve it again, it's been halved, it must be split.
         if SPLIT_ALL:  
             #well, that's easy, we split!
             should_this_split = True
         if suffix == "" and str(page_num) in DONT_SPLIT_PAGES:  
-            #also easy, we don't split. Overrides everything. (excepting recursion)
+            #also easy, we don't split. Overrides everything. (excepting spread halves)
             should_this_split = False
 
         if should_this_split:
+            # Rotate the page once; each split piece is then just a crop of it
+            img_rotated = img.transpose(Image.Transpose.ROTATE_270)
             thumbnail_scale = 1.0*THUMBNAIL_WIDTH/width
             thumbnail_height = int(thumbnail_scale*height)
             img_thumbnail = 0
             if THUMBNAIL_WIDTH > 0:
-                img_thumbnail = img.resize((THUMBNAIL_WIDTH,thumbnail_height), Image.Resampling.LANCZOS).rotate(-90, expand=True).convert("LA")
+                # A plain box average is plenty for a thumbnail this small, and far cheaper than LANCZOS
+                img_thumbnail = img.resize((THUMBNAIL_WIDTH,thumbnail_height), Image.Resampling.BOX).transpose(Image.Transpose.ROTATE_270)
                 draw = ImageDraw.Draw(img_thumbnail)
                 draw.rectangle((0,0,thumbnail_height,THUMBNAIL_WIDTH), outline=PADDING_COLOR, width=5)
 
@@ -262,11 +384,12 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
                     # Process overview page
                     page_view = uncropped_img;
                     if not SIDEWAYS_OVERVIEWS:
-                        page_view = uncropped_img.rotate(-90, expand=True)
+                        page_view = uncropped_img.transpose(Image.Transpose.ROTATE_270)
                     output_page = output_path_base.parent / f"{page_num:04d}{suffix}_0_overview.png"
                     save_with_padding(page_view, output_page, padcolor=PADDING_COLOR)
 
-            if OVERLAP or DESIRED_V_OVERLAP_SEGMENTS or SET_H_OVERLAP_SEGMENTS or page_num in SPECIAL_SPLITS_PAGES:
+            special_split = SPECIAL_SPLITS.get(page_num)
+            if OVERLAP or DESIRED_V_OVERLAP_SEGMENTS or SET_H_OVERLAP_SEGMENTS or special_split:
                 # DESIRED_V_OVERLAP_SEGMENTS = 3
                 # SET_H_OVERLAP_SEGMENTS = 1
                 # MINIMUM_V_OVERLAP_PERCENT = 5
@@ -275,10 +398,9 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
 
                 number_of_h_segments = SET_H_OVERLAP_SEGMENTS
                 h_overlap_percent = SET_H_OVERLAP_PERCENT
-                if SPECIAL_SPLITS and page_num in SPECIAL_SPLIT_PAGES:
-                    special_split_pos = SPECIAL_SPLIT_PAGES.index(page_num)
-                    number_of_h_segments = SPECIAL_SPLIT_HSPLITS[special_split_pos]
-                    h_overlap_percent = SPECIAL_SPLIT_HOVERLAP[special_split_pos]
+                if special_split:
+                    number_of_h_segments = special_split[0]
+                    h_overlap_percent = special_split[3]
                 total_calculated_width = MAX_SPLIT_WIDTH * number_of_h_segments - int((number_of_h_segments - 1) * (MAX_SPLIT_WIDTH * 0.01 * h_overlap_percent))
                     # so, 1 = 800. 2 with 33% overlap = 1334, 3 with 33% overlap = 1868px, etc.
                 established_scale = total_calculated_width * 1.0 / width
@@ -291,9 +413,8 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
 
                 number_of_v_segments = DESIRED_V_OVERLAP_SEGMENTS - 1
                 minimum_v_overlap = MINIMUM_V_OVERLAP_PERCENT
-                if SPECIAL_SPLITS and page_num in SPECIAL_SPLIT_PAGES:
-                    special_split_pos = SPECIAL_SPLIT_PAGES.index(page_num)
-                    number_of_v_segments = SPECIAL_SPLIT_VSPLITS[special_split_pos]-1
+                if special_split:
+                    number_of_v_segments = special_split[1]-1
                     minimum_v_overlap = -100
                 letter_keys = ["a","b","c","d","e","f","g","h","i","j","k","l","m","n","o","p","q","r","s","t","u","v","w","x","y","z"]
                 letter_keys_hsplit = ["a","b","c","d","e","f","g","h","i","j","k","l","m","n","o","p","q","r","s","t","u","v","w","x","y","z"]
@@ -320,38 +441,24 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
                 # Make overlapping segments that fill 800x480 screen.
                 v = 0
                 use_segment_list = []
-                if SPECIAL_SPLITS and page_num in SPECIAL_SPLIT_PAGES:
-                    special_split_pos = SPECIAL_SPLIT_PAGES.index(page_num)
-                    use_segment_list = SPECIAL_SPLIT_BOOLEANS[special_split_pos]
-                    print("special split for page:",SPECIAL_SPLIT_PAGES[special_split_pos]," segment list:",use_segment_list)
+                if special_split:
+                    use_segment_list = list(special_split[2])
+                    print("special split for page:",page_num," segment list:",use_segment_list)
                 while v < number_of_v_segments:
                     h = 0
                     while h < number_of_h_segments:
-                        segment = img.crop((shiftover_to_overlap*h, shiftdown_to_overlap*v, width-(shiftover_to_overlap*(number_of_h_segments-h-1)), height-(shiftdown_to_overlap*(number_of_v_segments-v-1))))
-                        segment_rotated = segment.rotate(-90, expand=True)
-                        if number_of_h_segments > 1:
-                            output = output_path_base.parent / f"{page_num:04d}{suffix}_3_{letter_keys[v]}_{letter_keys_hsplit[h]}.png"
-                        else:
-                            output = output_path_base.parent / f"{page_num:04d}{suffix}_3_{letter_keys[v]}.png"
-                        if THUMBNAIL_WIDTH > 0:
-                            if THUMBNAIL_HIGHLIGHT_ACTIVE:
-                                highlight_opacity = 96
-                                thumbnail_overlay = Image.new('LA', img_thumbnail.size)
-                                draw_thumb_overlay = ImageDraw.Draw(thumbnail_overlay)
-                                thumb_region_right = int(thumbnail_height - shiftdown_to_overlap*v*thumbnail_scale)
-                                thumb_region_top = int(shiftover_to_overlap*h*thumbnail_scale)
-                                thumb_region_left = int(thumbnail_height - shiftdown_to_overlap*v*thumbnail_scale - overlapping_height*thumbnail_scale)
-                                thumb_region_bottom = int(THUMBNAIL_WIDTH-(shiftover_to_overlap*(number_of_h_segments-h-1))*thumbnail_scale)
-                                draw_thumb_overlay.rectangle((thumb_region_left,thumb_region_top,thumb_region_right,thumb_region_bottom), fill=(255,highlight_opacity), outline=(PADDING_COLOR,255), width=3)
-                                img_temp_thumbnail = Image.alpha_composite(img_thumbnail, thumbnail_overlay).convert("L")
-                                if len(use_segment_list)==0 or use_segment_list[0]=="1":
-                                    size = save_with_padding(segment_rotated, output, padcolor=PADDING_COLOR, thumbnail=img_temp_thumbnail)    
+                        if len(use_segment_list)==0 or use_segment_list[0]=="1":
+                            segment_rotated = crop_rotated(img_rotated, height, (shiftover_to_overlap*h, shiftdown_to_overlap*v, width-(shiftover_to_overlap*(number_of_h_segments-h-1)), height-(shiftdown_to_overlap*(number_of_v_segments-v-1))))
+                            if number_of_h_segments > 1:
+                                output = output_path_base.parent / f"{page_num:04d}{suffix}_3_{letter_keys[v]}_{letter_keys_hsplit[h]}.png"
                             else:
-                                if len(use_segment_list)==0 or use_segment_list[0]=="1":
-                                    size = save_with_padding(segment_rotated, output, padcolor=PADDING_COLOR, thumbnail=img_thumbnail)
-                        else:
-                            if len(use_segment_list)==0 or use_segment_list[0]=="1":
-                                size = save_with_padding(segment_rotated, output, padcolor=PADDING_COLOR)
+                                output = output_path_base.parent / f"{page_num:04d}{suffix}_3_{letter_keys[v]}.png"
+                            thumb_region_right = int(thumbnail_height - shiftdown_to_overlap*v*thumbnail_scale)
+                            thumb_region_top = int(shiftover_to_overlap*h*thumbnail_scale)
+                            thumb_region_left = int(thumbnail_height - shiftdown_to_overlap*v*thumbnail_scale - overlapping_height*thumbnail_scale)
+                            thumb_region_bottom = int(THUMBNAIL_WIDTH-(shiftover_to_overlap*(number_of_h_segments-h-1))*thumbnail_scale)
+                            thumbnail = piece_thumbnail(img_thumbnail, (thumb_region_left,thumb_region_top,thumb_region_right,thumb_region_bottom))
+                            total_size += save_with_padding(segment_rotated, output, padcolor=PADDING_COLOR, thumbnail=thumbnail)
                         if len(use_segment_list)>0:
                             use_segment_list.pop(0)
                         h += 1
@@ -362,7 +469,7 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
                 #     h = 0
                 #     while h < number_of_h_segments:
                 #         segment = img.crop((shiftover_to_overlap*h, shiftdown_to_overlap*v, width-(shiftover_to_overlap*(number_of_h_segments-h-1)), height-(shiftdown_to_overlap*(number_of_v_segments-v-1))))
-                #         segment_rotated = segment.rotate(-90, expand=True)
+                #         segment_rotated = segment.transpose(Image.Transpose.ROTATE_270)
                 #         if number_of_h_segments > 1:
                 #             output = output_path_base.parent / f"{page_num:04d}{suffix}_3_{letter_keys[v]}_{letter_keys[h]}.png"
                 #         else:
@@ -376,92 +483,152 @@ def optimize_image(img_data, output_path_base, page_num, suffix=""):
                 # i = 0
                 # while i < number_of_segments:
                 #     segment = img.crop((0,shiftdown_to_overlap*i, width, height-(shiftdown_to_overlap*(number_of_segments-i-1))))
-                #     segment_rotated = segment.rotate(-90, expand=True)
+                #     segment_rotated = segment.transpose(Image.Transpose.ROTATE_270)
                 #     output = output_path_base.parent / f"{page_num:04d}{suffix}_3_{letter_keys[i]}.png"
                 #     size = save_with_padding(segment_rotated, output)
                 #     i += 1
 
                 # # Process top third
                 # top_third = img.crop((0, 0, width, overlapping_third_height))
-                # top_rotated = top_third.rotate(-90, expand=True)
+                # top_rotated = top_third.transpose(Image.Transpose.ROTATE_270)
                 # output_top = output_path_base.parent / f"{page_num:04d}{suffix}_3_a.png"
                 # size = save_with_padding(top_rotated, output_top)
                 # total_size += size;
 
                 # # Process middle third
                 # middle_third = img.crop((0, shiftdown_to_overlap, width, height - shiftdown_to_overlap))
-                # middle_rotated = middle_third.rotate(-90, expand=True)
+                # middle_rotated = middle_third.transpose(Image.Transpose.ROTATE_270)
                 # output_middle = output_path_base.parent / f"{page_num:04d}{suffix}_3_b.png"
                 # size = save_with_padding(middle_rotated, output_middle)
                 # total_size += size;
 
                 # # Process middle third
                 # bottom_third = img.crop((0, shiftdown_to_overlap*2, width, height))
-                # bottom_rotated = bottom_third.rotate(-90, expand=True)
+                # bottom_rotated = bottom_third.transpose(Image.Transpose.ROTATE_270)
                 # output_bottom = output_path_base.parent / f"{page_num:04d}{suffix}_3_c.png"
                 # size = save_with_padding(bottom_rotated, output_bottom)
                 # total_size += size;
 
             else:
                 # Process top half
-                top_half = img.crop((0, 0, width, half_height))
-                top_rotated = top_half.rotate(-90, expand=True)
+                top_rotated = crop_rotated(img_rotated, height, (0, 0, width, half_height))
                 output_top = output_path_base.parent / f"{page_num:04d}{suffix}_2_a.png"
-                if THUMBNAIL_WIDTH > 0:
-                    if THUMBNAIL_HIGHLIGHT_ACTIVE:
-                        highlight_opacity = 96
-                        thumbnail_overlay = Image.new('LA', img_thumbnail.size)
-                        draw_thumb_overlay = ImageDraw.Draw(thumbnail_overlay)
-                        draw_thumb_overlay.rectangle((thumbnail_height//2,0,thumbnail_height,THUMBNAIL_WIDTH), fill=(255,highlight_opacity), outline=(PADDING_COLOR,255), width=3)
-                        img_temp_thumbnail = Image.alpha_composite(img_thumbnail, thumbnail_overlay).convert("L")
-                        size = save_with_padding(top_rotated, output_top, padcolor=PADDING_COLOR, thumbnail=img_temp_thumbnail)
-                    else:
-                        size = save_with_padding(top_rotated, output_top, padcolor=PADDING_COLOR, thumbnail=img_thumbnail)
-                else:
-                    size = save_with_padding(top_rotated, output_top, padcolor=PADDING_COLOR)
-                total_size += size
+                thumbnail = piece_thumbnail(img_thumbnail, (thumbnail_height//2,0,thumbnail_height,THUMBNAIL_WIDTH))
+                total_size += save_with_padding(top_rotated, output_top, padcolor=PADDING_COLOR, thumbnail=thumbnail)
                 
                 # Process bottom half
-                bottom_half = img.crop((0, half_height, width, height))
-                bottom_rotated = bottom_half.rotate(-90, expand=True)
+                bottom_rotated = crop_rotated(img_rotated, height, (0, half_height, width, height))
                 output_bottom = output_path_base.parent / f"{page_num:04d}{suffix}_2_b.png"
-                if THUMBNAIL_WIDTH > 0:
-                    if THUMBNAIL_HIGHLIGHT_ACTIVE:
-                        highlight_opacity = 96
-                        thumbnail_overlay = Image.new('LA', img_thumbnail.size)
-                        draw_thumb_overlay = ImageDraw.Draw(thumbnail_overlay)
-                        draw_thumb_overlay.rectangle((0,0,thumbnail_height//2,THUMBNAIL_WIDTH), fill=(255,highlight_opacity), outline=(PADDING_COLOR,255), width=3)
-                        img_temp_thumbnail = Image.alpha_composite(img_thumbnail, thumbnail_overlay).convert("L")
-                        size = save_with_padding(bottom_rotated, output_bottom, padcolor=PADDING_COLOR, thumbnail=img_temp_thumbnail)
-                    else:
-                        size = save_with_padding(bottom_rotated, output_bottom, padcolor=PADDING_COLOR, thumbnail=img_thumbnail)
-                else:
-                    size = save_with_padding(bottom_rotated, output_bottom, padcolor=PADDING_COLOR)
-                total_size += size
+                thumbnail = piece_thumbnail(img_thumbnail, (0,0,thumbnail_height//2,THUMBNAIL_WIDTH))
+                total_size += save_with_padding(bottom_rotated, output_bottom, padcolor=PADDING_COLOR, thumbnail=thumbnail)
         
         elif width >= height or str(page_num) in SPLIT_SPREADS_PAGES:
             # Process wide page, or specifically split narrow page (rare, but for two-column layouts)
             # top_half = img.crop((0, 0, width, half_height))
-            page_rotated = img.rotate(-90, expand=True)
+            page_rotated = img.transpose(Image.Transpose.ROTATE_270)
             output_page = output_path_base.parent / f"{page_num:04d}{suffix}_0_spread.png"
             size = save_with_padding(page_rotated, output_page, padcolor=PADDING_COLOR)
             if SPLIT_SPREADS and (SPLIT_SPREADS_PAGES[0] == "all" or str(page_num) in SPLIT_SPREADS_PAGES):
-                splitLeft = optimize_image(img_data, output_path_base, page_num, suffix=suffix+".1")
-                splitRight = optimize_image(img_data, output_path_base, page_num, suffix=suffix+".2")
+                halves = [suffix+".1", suffix+".2"]
             total_size += size
         else: 
             # This is a dont-split page, treat like overview page
             page_view = uncropped_img;
             if not SIDEWAYS_OVERVIEWS:
-                page_view = uncropped_img.rotate(-90, expand=True)
+                page_view = uncropped_img.transpose(Image.Transpose.ROTATE_270)
             output_page = output_path_base.parent / f"{page_num:04d}{suffix}_0_overview.png"
             save_with_padding(page_view, output_page, padcolor=PADDING_COLOR)
 
-        return total_size
+        return total_size, halves
         
     except Exception as e:
         print(f"    Warning: Could not optimize image: {e}")
-        return 0
+        return 0, []
+
+def crop_rotated(img_rotated, height, box):
+    """
+    Crop box, given in the unrotated page's coordinates, out of the page
+    already rotated 90° clockwise (height = unrotated page height).
+    Same result as img.crop(box).transpose(Image.Transpose.ROTATE_270).
+    """
+    left, top, right, bottom = box
+    return img_rotated.crop((height - bottom, left, height - top, right))
+
+
+def content_bbox(img, background=59, ink=40):
+    """
+    Bounding box of whatever isn't page background in an 'L' image.
+    Same box as invert + autocontrast(cutoff=(background, ink)) + getbbox,
+    but the cutoffs are worked out on the histogram, leaving one threshold pass.
+    """
+    levels = img.histogram()[::-1]  # indexed by darkness, like the inverted image
+    total = sum(levels)
+
+    def first_kept(counts, cut):
+        # first bin autocontrast keeps after trimming cut pixels off that end
+        for level, count in enumerate(counts):
+            if cut < count:
+                return level
+            cut -= count
+        return len(counts) - 1
+
+    lo = first_kept(levels, total * background // 100)
+    hi = 255 - first_kept(levels[::-1], total * ink // 100)
+    if hi <= lo:
+        lo = 0  # autocontrast gives up and leaves the image as is
+    # anything darker than the lo darkness level survives the stretch
+    return img.point([255 if 255 - v > lo else 0 for v in range(256)]).getbbox()
+
+
+def highlight_thumbnail(thumbnail, box):
+    """
+    Return a copy of the thumbnail with box lightened and outlined,
+    marking which part of the page the current screen shows.
+    Same look as compositing a translucent white rectangle, but just a LUT on the box.
+    """
+    highlighted = thumbnail.copy()
+    crop_box = (box[0], box[1], box[2] + 1, box[3] + 1)  # rectangle() includes the far edge, crop() doesn't
+    highlighted.paste(highlighted.crop(crop_box).point(HIGHLIGHT_LUT), crop_box[:2])
+    ImageDraw.Draw(highlighted).rectangle(box, outline=PADDING_COLOR, width=3)
+    return highlighted
+
+
+def piece_thumbnail(img_thumbnail, box):
+    """
+    Thumbnail to show beside one split piece of a page:
+    highlighted at box, plain with --no-thumb-highlight, or False with no thumbnails.
+    """
+    if THUMBNAIL_WIDTH <= 0:
+        return False
+    if THUMBNAIL_HIGHLIGHT_ACTIVE:
+        return highlight_thumbnail(img_thumbnail, box)
+    return img_thumbnail
+
+
+def get_sample_font():
+    """
+    Return the 100px default font for the sample labels.
+    Loaded once per process rather than for every sample page.
+    """
+    global _sample_font
+    if _sample_font is None:
+        _sample_font = ImageFont.load_default(size=100)
+    return _sample_font
+
+
+def get_canvas(padcolor):
+    """
+    Return this thread's reusable 480x800 'L' canvas, filled with padcolor
+    Saves allocating a fresh screen-sized image for every output page.
+    """
+    canvas = getattr(_thread_state, 'canvas', None)
+    if canvas is None:
+        canvas = Image.new('L', (TARGET_WIDTH, TARGET_HEIGHT), color=padcolor)
+        _thread_state.canvas = canvas
+    else:
+        canvas.paste(padcolor, (0, 0, TARGET_WIDTH, TARGET_HEIGHT))
+    return canvas
+
 
 def save_with_padding(img, output_path, *, padcolor=255, thumbnail=False):
     """
@@ -474,17 +641,19 @@ def save_with_padding(img, output_path, *, padcolor=255, thumbnail=False):
     new_width = int(img_width * scale)
     new_height = int(img_height * scale)
     
-    img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+    img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
     
-    # Apply dithering if enabled (for better grayscale → B&W conversion)
-    if USE_DITHERING:
-        # Convert to 1-bit with Floyd-Steinberg dithering
+    # Dithering the whole screen keeps a black or white border solid, but would
+    # speckle a gray one (the --sample-set frames), so then dither just the pieces.
+    dither_pieces = USE_DITHERING and padcolor not in (0, 255)
+    if dither_pieces:
+        # (paste() expands them back to grayscale on the canvas, no extra convert needed)
         img_resized = img_resized.convert('1', dither=Image.Dither.FLOYDSTEINBERG)
-        # Convert back to grayscale mode so we can paste on white background
-        img_resized = img_resized.convert('L')
+        if thumbnail:
+            thumbnail = thumbnail.convert('1', dither=Image.Dither.FLOYDSTEINBERG)
     
-    # Create background (default padcolor is white)
-    result = Image.new('L', (TARGET_WIDTH, TARGET_HEIGHT), color=padcolor)
+    # Reuse this thread's background canvas, filled with padcolor (default white)
+    result = get_canvas(padcolor)
     
     # Center the image
     x = (TARGET_WIDTH - new_width) // 2
@@ -499,21 +668,37 @@ def save_with_padding(img, output_path, *, padcolor=255, thumbnail=False):
     if thumbnail:
         # thumb_width, thumb_height = thumbnail.size
         # thumb_x = 0
-        if USE_DITHERING:
-            # Convert to 1-bit with Floyd-Steinberg dithering
-            thumbnail = thumbnail.convert('1', dither=Image.Dither.FLOYDSTEINBERG)
-            # Convert back to grayscale mode so we can paste on white background
-            thumbnail = thumbnail.convert('L')
         result.paste(thumbnail, (0,0))
 
-    result.save(output_path, 'PNG', optimize=True)
+    # Apply dithering if enabled (for better grayscale → B&W conversion)
+    if USE_DITHERING and not dither_pieces:
+        # Floyd-Steinberg dither the composed screen once, page and thumbnail together.
+        # Pure black or white padding has no error to spread, so it stays solid.
+        # Back to 'L' (0/255 only) for png2xtc, which has only ever been given grayscale PNGs.
+        result = result.convert('1', dither=Image.Dither.FLOYDSTEINBERG).convert('L')
+
+    # These PNGs are only intermediates for png2xtc, so favor speed over size.
+    # Encode in memory and write once, which also gives us the size without a stat().
+    buffer = BytesIO()
+    result.save(buffer, 'PNG', compress_level=PNG_COMPRESS_LEVEL)
+    data = buffer.getbuffer()
+    with open(output_path, 'wb') as f:
+        f.write(data)
     
-    return output_path.stat().st_size
+    return len(data)
 
 
-def extract_cbz_to_png(cbz_path, temp_dir):
+def natural_sort_key(name):
+    """
+    Sort key that orders embedded numbers by value, so page2 comes before page10
+    """
+    return [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', name)]
+
+
+def extract_cbz_to_png(cbz_path, temp_dir, page_pool=None):
     """
     Extract CBZ and convert to optimized PNGs
+    Pages are handed to page_pool (a process pool) if given, else done inline.
     Returns the folder path with PNGs or None if failed
     """
     cbz_name = cbz_path.stem
@@ -522,229 +707,391 @@ def extract_cbz_to_png(cbz_path, temp_dir):
     
     try:
         with zipfile.ZipFile(cbz_path, 'r') as zip_ref:
-            file_list = zip_ref.namelist()
             image_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp')
             os_metadata_exclusions = ('__macos') # .cbzs made on Macs sometimes have mac-specific metadata in a __macos directory.
-            image_files = [f for f in file_list if f.lower().endswith(image_extensions) and not f.lower().startswith(os_metadata_exclusions)]
-            image_files.sort()
+            # Work with the ZipInfo entries directly so each read skips the name lookup.
+            image_files = [zi for zi in zip_ref.infolist() if not zi.is_dir() and zi.filename.lower().endswith(image_extensions) and not zi.filename.lower().startswith(os_metadata_exclusions)]
+            image_files.sort(key=lambda zi: natural_sort_key(zi.filename))
 
             if not image_files:
-                print(f"  ✗ No images found in {cbz_name}")
+                report(f"  ✗ No images found in {cbz_name}")
                 return None
             
-            print(f"  Extracting {len(image_files)} pages...", end=" ", flush=True)
-            
-            for idx, img_file in enumerate(image_files, 1):
-                img_data = zip_ref.read(img_file)
+            # Page numbers follow the name order, but read the entries in the order
+            # they're stored in the archive so the file is read front to back.
+            pages = sorted(enumerate(image_files, 1), key=lambda page: page[1].header_offset)
+
+            pending = set()
+            for idx, img_file in pages:
+                if not page_wanted(idx):
+                    continue
                 output_base = output_folder / f"{idx:04d}"
-                optimize_image(img_data, output_base, idx)
+                # Worker processes need the entry as bytes (zip streams can't be pickled)
+                img_data = zip_ref.read(img_file)
+                if page_pool is None:
+                    optimize_image(img_data, output_base, idx)
+                    continue
+                # Cap the pages in flight so a big archive isn't all held in memory at once
+                if len(pending) >= MAX_PAGES_IN_FLIGHT:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(page_pool.submit(optimize_image, img_data, output_base, idx))
+            for future in pending:
+                future.result()
             
-            print(f"✓")
+            report(f"  Extracting {len(image_files)} pages... ✓")
             return output_folder
             
     except Exception as e:
-        print(f"  ✗ Error: {e}")
+        report(f"  ✗ Error: {e}")
         return None
 
 
-def convert_png_folder_to_xtc(png_folder, output_file):
+def convert_png_folder_to_xtc(png_folder, output_file, png2xtc_path=None):
     """
     Convert folder of PNGs to XTC using png2xtc.py
+    png2xtc_path is looked up with find_png2xtc() if not given.
     """
-    png2xtc_path = find_png2xtc()
+    if png2xtc_path is None:
+        png2xtc_path = find_png2xtc()
     
     if not png2xtc_path:
-        print(f"  ✗ Error: png2xtc.py not found")
-        print(f"     Please install epub2xtc or set PNG2XTC_PATH environment variable")
+        report(f"  ✗ Error: png2xtc.py not found",
+               f"     Please install epub2xtc or set PNG2XTC_PATH environment variable")
         return False
     
     try:
         # print("trying path:",str(png2xtc_path))
+        # Run png2xtc with the same interpreter that is running us, so it sees
+        # the same installed packages (and works where "python" isn't on PATH).
+        # Its own process, so a hung png2xtc is killed when the timeout hits.
+        # Only stderr is shown (on failure), so don't pipe and decode stdout at all.
         result = subprocess.run(
-            ["python", str(png2xtc_path), str(png_folder), str(output_file)],
-            # I had to use the following instead to make this work on my Mac.
-            # ["python3", str(png2xtc_path) + "/png2xtc.py", str(png_folder), str(output_file)],
-            capture_output=True,
-            text=True,
-            timeout=300  # 5 minute timeout
+            [sys.executable, str(png2xtc_path), str(png_folder), str(output_file)],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=PNG2XTC_TIMEOUT
         )
+        returncode, stderr = result.returncode, result.stderr.decode('utf-8', 'replace')
         
-        if result.returncode == 0 and output_file.exists():
+        if returncode == 0 and output_file.exists():
             size_mb = output_file.stat().st_size / 1024 / 1024
-            print(f"  ✓ Created {output_file.name} ({size_mb:.1f}MB)")
+            report(f"  ✓ Created {output_file.name} ({size_mb:.1f}MB)")
             return True
         else:
-            print(f"  ✗ Conversion failed: {result.stderr}")
+            report(f"  ✗ Conversion failed: {stderr}")
             return False
             
     except subprocess.TimeoutExpired:
-        print(f"  ✗ Conversion timed out")
+        report(f"  ✗ Conversion timed out")
         return False
     except Exception as e:
-        print(f"  ✗ Error: {e}")
+        report(f"  ✗ Error: {e}")
         return False
 
 
-def process_cbz_file(cbz_path, output_dir, temp_dir, clean_temp, file_num=None, total_files=None):
+def scan_for_cbz(folder):
     """
-    Full pipeline: CBZ → PNG → XTC
+    List a folder once with os.scandir
+    Returns (cbz_files, subdirs), both as Paths sorted by name.
+    Extension match is case-insensitive (.cbz, .CBZ, ...).
+    """
+    cbz_files = []
+    subdirs = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(Path(entry.path))
+            elif entry.name.lower().endswith(".cbz") and entry.is_file():
+                cbz_files.append(Path(entry.path))
+    cbz_files.sort()
+    subdirs.sort()
+    return cbz_files, subdirs
+
+
+def start_cbz_file(cbz_path, temp_dir, file_num=None, total_files=None, page_pool=None):
+    """
+    First stage: CBZ → PNG folder
+    Returns (png_folder or None if failed, start time).
     """
     progress_prefix = f"[{file_num}/{total_files}] " if file_num and total_files else ""
-    print(f"\n{progress_prefix}Processing: {cbz_path.name}")
+    report(f"\n{progress_prefix}Processing: {cbz_path.name}")
     
-    start_time = time.time()
+    start_time = time.perf_counter()
     
     # Step 1: Extract and optimize to PNG
-    png_folder = extract_cbz_to_png(cbz_path, temp_dir)
-    if not png_folder:
-        return False, cbz_path.name, 0
-    
+    png_folder = extract_cbz_to_png(cbz_path, temp_dir, page_pool)
+    return png_folder, start_time
+
+
+def finish_cbz_file(cbz_path, png_folder, output_dir, clean_temp, start_time, png2xtc_path=None, cleanup_pool=None):
+    """
+    Second stage: PNG folder → XTC, then clean up
+    The temp PNGs are deleted on cleanup_pool if given, without waiting for it.
+    Returns (success, file name, seconds since start_time).
+    """
     # Step 2: Convert to XTC
     output_file = output_dir / f"{cbz_path.stem}.xtc"
-    success = convert_png_folder_to_xtc(png_folder, output_file)
+    success = convert_png_folder_to_xtc(png_folder, output_file, png2xtc_path)
     
     # Step 3: Clean up temp files if requested
     if clean_temp and png_folder.exists():
-        shutil.rmtree(png_folder)
+        if cleanup_pool is not None:
+            cleanup_pool.submit(shutil.rmtree, png_folder, ignore_errors=True)
+        else:
+            shutil.rmtree(png_folder)
     
-    elapsed = time.time() - start_time
+    elapsed = time.perf_counter() - start_time
     return success, cbz_path.name, elapsed
 
 
+def page_list(value):
+    """
+    Parse a comma separated page list like "1,5,12" (or "all")
+    Page numbers are kept as strings, matching how they are compared later.
+    """
+    return value.split(',')
+
+
+def parse_contrast_boost(value):
+    """
+    Parse --contrast-boost: "#" for both sides, or "dark,light"
+    Returns a (dark, light) tuple of ints.
+    """
+    try:
+        parts = [int(part) for part in value.split(',')]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or two numbers like 3,5, got '{value}'")
+    if len(parts) == 1:
+        return parts[0], parts[0]
+    return parts[0], parts[1]
+
+
+def parse_levels(value):
+    """
+    Parse --contrast-fixed levels: "lo,hi" with 0 <= lo < hi <= 255
+    """
+    try:
+        lo, hi = (int(part) for part in value.split(','))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected two numbers like 40,220, got '{value}'")
+    if not 0 <= lo < hi <= 255:
+        raise argparse.ArgumentTypeError(f"levels must satisfy 0 <= lo < hi <= 255, got '{value}'")
+    return lo, hi
+
+
+def levels_lut(lo, hi):
+    """
+    Build a 256 entry LUT mapping lo..hi linearly onto 0..255 (clipped outside)
+    """
+    return [max(0, min(255, round((v - lo) * 255 / (hi - lo)))) for v in range(256)]
+
+
+# --special-split / --special-contrast specifiers, matched in one go
+SPECIAL_SPLIT_RE = re.compile(r'(\d+)-(\d+)-(\d+)(?:-([01]*)(?:-(\d+))?)?')
+SPECIAL_CONTRAST_RE = re.compile(r'(\d+)-(\d+)-(\d+)')
+
+
+def parse_special_split_spec(value):
+    """
+    Parse --special-split specifiers: pagenum-hsplit-vsplit[-booleans[-hoverlap]]
+    Returns a list of (page, hsplits, vsplits, booleans, hoverlap) tuples.
+    hoverlap is None when not given, and is filled in from --hsplit-overlap later.
+    """
+    specs = []
+    for specifier in value.split(','):
+        match = SPECIAL_SPLIT_RE.fullmatch(specifier)
+        if not match:
+            raise argparse.ArgumentTypeError(f"invalid special-split specifier: '{specifier}'")
+        page, hsplits, vsplits, booleans, hoverlap = match.groups()
+        specs.append((int(page), int(hsplits), int(vsplits), list(booleans) if booleans else '',
+                      int(hoverlap) if hoverlap else None))
+    return specs
+
+
+def parse_special_contrast_spec(value):
+    """
+    Parse --special-contrast specifiers: pagenum-darkcontrast-lightcontrast
+    Returns a list of (page, dark, light) tuples.
+    """
+    specs = []
+    for specifier in value.split(','):
+        match = SPECIAL_CONTRAST_RE.fullmatch(specifier)
+        if not match:
+            raise argparse.ArgumentTypeError(f"invalid special-contrast specifier: '{specifier}'")
+        specs.append(tuple(int(part) for part in match.groups()))
+    return specs
+
+
+HELP_DESCRIPTION = "Converts CBZ manga files to XTC format optimized for XTEink X4"
+
+HELP_EPILOG = """\
+What it does:
+  1. Extracts images from CBZ files
+  2. Splits each page in half and rotates 90°
+  3. Resizes to 480×800 with white padding
+  4. Converts to grayscale PNG (with dithering by default)
+  5. Converts PNG to XTC format (fast loading!)
+  6. Converts pages in parallel on all CPU cores (up to 4 files at a time)
+
+Output:
+  - XTC files saved to: ./xtc_output/
+  - Temp PNGs saved to: ./.temp_png/ (unless --clean)
+
+Examples:
+  cbz2xtc                           # Basic conversion (with dithering)
+  cbz2xtc --clean                   # With cleanup
+  cbz2xtc --no-dither               # Without dithering
+  cbz2xtc --contrast-boost 3,5 --margin 5,3.5,5,3.5 --split-spreads all
+                     # good trial settings for a mainstream comic.
+  cbz2xtc --dont-split 1            # show cover as single image
+  cbz2xtc --sideways-overviews --dont-split 17 --select-overviews 19,24
+                     # A sideways overview will be used instead of splits
+                     # for page 17, and a sideways overview will come
+                     # before the splits for pages 19 and 24.
+  cbz2xtc --overlap --vsplit-target 7 --thumbnail 120 --hsplit-max-width 700
+                     # Break up the page so it scrolls a little with
+                     # each advance, showing the currently viewed segment
+                     # as a highlight on a small thumbnail.
+  cbz2xtc --overlap --hsplit-count 2 --hsplit-overlap 25 --hsplit-max-width 600
+                     # split the page horizontally as well as vertically,
+                     # with a slight overlap, only using 600px screen width on
+                     # target device for the segmented pieces.
+  cbz2xtc D:\\manga --clean          # Specific folder + cleanup
+"""
+
+
+def build_arg_parser():
+    """
+    Build the command line parser for cbz2xtc
+    """
+    parser = argparse.ArgumentParser(
+        prog="cbz2xtc",
+        description=HELP_DESCRIPTION,
+        epilog=HELP_EPILOG,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        # full option names only, like before (--contrast would be ambiguous anyway)
+        allow_abbrev=False,
+    )
+    parser.add_argument("input_dir", nargs="?", metavar="folder",
+        help="Folder containing CBZ files (default: current directory)")
+    parser.add_argument("--no-dither", dest="use_dithering", action="store_false",
+        help="Disable Floyd-Steinberg dithering. By default, dithering is ENABLED "
+             "for better grayscale to black & white conversion. Use this flag for "
+             "pure threshold conversion (sharper for clean line art).")
+    parser.add_argument("--dither", dest="use_dithering", action="store_true",
+        help=argparse.SUPPRESS)
+    parser.add_argument("--overlap", action="store_true",
+        help="Split into 3 overlapping screen-filling pieces instead of 2 "
+             "non-overlapping pieces that may leave margins.")
+    parser.add_argument("--thumbnail", type=int, default=0, metavar="#",
+        help="Creates a thumbnail that is # pixels wide on the left side. "
+             "If using --overlap, combine with --hsplit-max-width")
+    parser.add_argument("--no-thumb-highlight", dest="thumb_highlight", action="store_false",
+        help="Do not highlight the position of the currently active split "
+             "portion on the thumbnail (if present).")
+    parser.add_argument("--split-spreads", type=page_list, metavar="all|PAGES",
+        help="Splits wide pages in half, and then split each of the halves as "
+             "if they were normal pages. Useful if the wide pages are "
+             "double-page spreads with text.")
+    parser.add_argument("--split-all", action="store_true",
+        help="Splits ALL pages into pieces, even if those pages are wider "
+             "than they are tall.")
+    parser.add_argument("--skip", type=page_list, metavar="PAGES",
+        help="Skips page or pages entirely.")
+    parser.add_argument("--only", type=page_list, metavar="PAGES",
+        help="Only renders the selected page or pages. Tip: If you don't use "
+             "--clean, this can be used to rerender a problematic page or pages "
+             "with different settings than the rest.")
+    parser.add_argument("--dont-split", type=page_list, metavar="PAGES",
+        help="Don't split page or pages, will use an overview instead (vertical "
+             "if --sideways-overviews is unset.) For covers and splash pages.")
+    parser.add_argument("--contrast-boost", type=parse_contrast_boost, metavar="0-8|#,#",
+        help="Enhances contrast by clipping off brightest and darkest parts of "
+             "the image. 0=no boost, 4=strong (default), 6=very strong, "
+             "8=insane. If you specify two values with a comma, the first will "
+             "be used for dark parts, and the second for light parts. In "
+             "general, text will be more readable by increasing dark contrast, "
+             "and images will gain clarity by increasing light contrast.")
+    parser.add_argument("--contrast-fixed", type=parse_levels, metavar="LO,HI",
+        help="Use fixed levels instead of the per-page contrast boost: gray "
+             "values at or below LO become black, at or above HI become white, "
+             "and values in between are stretched. (0-255, e.g. 40,220) Faster, "
+             "and consistent from page to page. --special-contrast pages still "
+             "use their own settings.")
+    parser.add_argument("--margin", "--margins", dest="margin", metavar="auto|#|L,T,R,B",
+        help="Crops off page margins by a percentage of the width or height. "
+             "Use a single number to crop from all sides equally, or specify "
+             "the cropping for each side in LTRB order. '--margin auto' trims "
+             "white space from all 4 sides. (margin crop is not applied to "
+             "overview pages.)")
+    parser.add_argument("--include-overviews", action="store_true",
+        help="Show an overview of each page before the split pieces.")
+    parser.add_argument("--sideways-overviews", action="store_true",
+        help="Show a rotated overview of each page before the split pieces. "
+             "(better quality, but will require reader to turn their device sideways)")
+    parser.add_argument("--select-overviews", type=page_list, metavar="PAGES",
+        help="Add overview pages for only the specified pages instead of for all "
+             "pages. Will use vertical overviews if --sideways-overviews is unset. "
+             "(--dont-split's listed pagenums will still automatically get "
+             "overviews and don't need to be listed here again.)")
+    parser.add_argument("--start", type=int, metavar="PAGE",
+        help="Don't process pages before this page.")
+    parser.add_argument("--stop", type=int, metavar="PAGE",
+        help="Don't process pages after this page.")
+    parser.add_argument("--pad-black", action="store_true",
+        help="Pad things that don't fill screen with black instead")
+    parser.add_argument("--hsplit-count", type=int, metavar="#",
+        help="Split page horizontally into # segments.")
+    parser.add_argument("--hsplit-overlap", type=float, metavar="FLOAT",
+        help="Horizontal overlap between segments in percent. Default is 70 "
+             "percent. Lowering this value will almost always result in "
+             "automatically splitting the page vertically into more than 3 segments.")
+    parser.add_argument("--hsplit-max-width", type=int, metavar="#",
+        help="Limit the width of horizontal segments to less than full screen. "
+             "(allows for lower amounts of overlap without requiring extra "
+             "vertical segmentation.)")
+    parser.add_argument("--vsplit-target", type=int, metavar="#",
+        help="Try to split page vertically into # segments. If this would "
+             "result in missing data or insufficient overlap of segments, it "
+             "will automatically add more.")
+    parser.add_argument("--vsplit-min-overlap", type=float, metavar="FLOAT",
+        help="Minimum vertical overlap between segments, in percent. Default is 5 percent.")
+    parser.add_argument("--manga", action="store_true",
+        help="Horizontal splits and --split-spreads will be ordered "
+             "right-to-left instead of left-to-right in the output.")
+    parser.add_argument("--sample-set", type=page_list, metavar="PAGES",
+        help="Build a spread of contrast and margin samples for a page or list "
+             "of pages. Useful for evaluating what settings you want to use. "
+             "Does contrasts 0-8, margin 0-10 percent")
+    parser.add_argument("--special-split", type=parse_special_split_spec, metavar="SPECS",
+        help="(Advanced) specifier = pagenum-hsplit-vsplit-booleans-hoverlap, "
+             "where hoverlap is horizontal overlap to use, and booleans is a "
+             "list of 1 and 0s representing whether each segment is included "
+             "in output or not. Ex: 121-2-4-01010111-50 "
+             "Booleans and hoverlap are optional.")
+    parser.add_argument("--special-contrast", type=parse_special_contrast_spec, metavar="SPECS",
+        help="(Advanced) specifier = pagenum-darkcontrast-lightcontrast, "
+             "indicating alternate contrast settings for each specified page. Ex: 121-5-2")
+    parser.add_argument("--clean", action="store_true",
+        help="Automatically delete temporary PNG files after conversion. Saves "
+             "disk space and prevents leftover files from interfering with "
+             "conversions using different split or overview settings.")
+    return parser
+
+
 def main():
     print("=" * 60)
     print("CBZ to XTC Converter for XTEink X4")
     print("=" * 60)
-    
-    # Check for help flag
-    if "--help" in sys.argv or "-h" in sys.argv:
-        print("\nConverts CBZ manga files to XTC format optimized for XTEink X4")
-        print("\nUsage:")
-        print("  cbz2xtc                           # Process current directory")
-        print("  cbz2xtc /path/to/folder           # Process specific folder")
-        print("  cbz2xtc --no-dither               # Disable dithering")
-        print("  cbz2xtc --clean                   # Auto-delete temp PNG files")
-        print("  cbz2xtc --no-dither --clean       # Combine options")
-        print("\nOptions:")
-        print("  --no-dither   Disable Floyd-Steinberg dithering. By default,")
-        print("                dithering is ENABLED for better grayscale to")
-        print("                black & white conversion. Use this flag for pure")
-        print("                threshold conversion (sharper for clean line art).")
-        print("\n  --overlap     Split into 3 overlapping screen-filling pieces instead")
-        print("                of 2 non-overlapping pieces that may leave margins.")
-        print("\n  --thumbnail <#>   Creates a thumbnail that is # pixels wide on the left")
-        print("                side. If using --overlap, combine with --hsplit-max-width")
-        print("\n  --no-thumb-highlight   Do not highlight the position of the currently")
-        print("                active split portion on the thumbnail (if present).")
-        print("\n  --split-spreads all or <pagenum> or <pagenum,pagenum,pagenum...>")
-        print("                Splits wide pages in half, and then split each of the")
-        print("                halves as if they were normal pages. Useful if the")
-        print("                wide pages are double-page spreads with text.")
-        print("\n  --split-all   Splits ALL pages into pieces, even if those pages")
-        print("                are wider than they are tall.")
-        print("\n  --skip <pagenum> or <pagenum,pagenum,pagenum...>   skips page")
-        print("                or pages entirely.")
-        print("\n  --only <pagenum> or <pagenum,pagenum,pagenum...>   only renders")
-        print("                the selected page or pages. Tip: If you don't use")
-        print("                --clean, this can be used to rerender a problematic")
-        print("                page or pages with different settings than the rest.")
-        print("\n  --dont-split <pagenum> or <pagenum,pagenum,pagenum...>   don't split")
-        print("                page or pages, will use an overview instead (vertical if")
-        print("                --sideways-overviews is unset.) For covers and splash pages.")
-        print("\n  --contrast-boost <0-8> or <#,#>   Enhances contrast by clipping off,")
-        print("                brightest and darkest parts of the image. 0=no boost,")
-        print("                4=strong (default), 6=very strong, 8=insane. If you")
-        print("                specify two values with a comma, the first will be used")
-        print("                for dark parts, and the second for light parts.")
-        print("                in general, text will be more readable by increasing")
-        print("                dark contrast, and images will gain clarity by")
-        print("                increasing light contrast.")
-        print("\n  --margin auto or <float> or <left,top,right,bottom>   crops off")
-        print("                page margins by a percentage of the width or height.")
-        print("                Use a single number to crop from all sides equally, or")
-        print("                specify the cropping for each side in LTRB order.")
-        print("                '--margin auto' trims white space from all 4 sides.")
-        print("                (margin crop is not applied to overview pages.)")
-        print("\n  --include-overviews   Show an overview of each page before the")
-        print("                split pieces.")
-        print("\n  --sideways-overviews   Show a rotated overview of each page before")
-        print("                the split pieces. (better quality, but will require)")
-        print("                reader to turn their device sideways)")
-        print("\n  --select-overviews <pagenum> or <pagenum,pagenum,pagenum...>  Add")
-        print("                overview pages for only the specified pages instead of")
-        print("                for all pages. Will use vertical overviews if")
-        print("                --sideways-overviews is unset. (--dont-split's listed")
-        print("                pagenums will still automatically get overviews and")
-        print("                don't need to be listed here again.)")
-        print("\n  --start <pagenum>   Don't process pages before this page.")
-        print("\n  --stop <pagenum>    Don't process pages after this page.")
-        print("\n  --pad-black   Pad things that don't fill screen with black instead")
-        print("\n  --hsplit-count <#>   Split page horizontally into # segments.")
-        print("\n  --hsplit-overlap <float>   horizontal overlap between segments in")
-        print("                percent. Default is 70 percent. Lowering this value will")  
-        print("                almost always result in automatically splitting the page")  
-        print("                vertically into more than 3 segments.")
-        print("\n  --hsplit-max-width <#>   limit the width of horizontal segments")
-        print("                to less than full screen. (allows for lower amounts of")
-        print("                overlap without requiring extra vertical segmentation.)")
-        print("\n  --vsplit-target <#>   try to split page vertically into # segments.")
-        print("                if this would result it missing data or insufficient")
-        print("                overlap of segments, it will automatically add more.")           
-        print("\n  --vsplit-min-overlap <float>   minimum vertical overlap between segments.")
-        print("                in percent. Default is 5 percent.")  
-        print("\n  --manga       Horizontal splits and --split-spreads will be ordered")
-        print("                right-to-left instead of left-to-right in the output.")  
-        print("\n  --sample-set <pagenum> or <pagenum,pagenum,pagenum...>  Build a")
-        print("                spread of contrast and margin samples for a page or")
-        print("                list of pages. Useful for evaluating what settings")
-        print("                you want to use. Does contrasts 0-8, margin 0-10 percent")
-        print("\n  --special-split <specifier> or <specifier,specifier,specifier...> ")
-        print("                (Advanced) specifier = pagenum-hsplit-vsplit-booleans-hoverlap,")
-        print("                where hoverlap is horizontal overlap to use, and")
-        print("                booleans is a list of 1 and 0s representing whether each")
-        print("                segment is included in output or not. Ex: 121-2-4-01010111-50")
-        print("                Booleans and hoverlap are optional.")
-        print("\n  --special-contrast <specifier> or <specifier,specifier,specifier...> ")
-        print("                (Advanced) specifier = pagenum-darkcontrast-lightcontrast,")
-        print("                indicating alternate contrast settings for each specified")
-        print("                page. Ex: 121-5-2")
-        print("\n  --clean      Automatically delete temporary PNG files after")
-        print("                conversion. Saves disk space and prevents leftover")
-        print("                files from interfering with conversions using different")
-        print("                split or overview settings.")
-        print("\n  --help, -h    Show this help message")
-        print("\nWhat it does:")
-        print("  1. Extracts images from CBZ files")
-        print("  2. Splits each page in half and rotates 90°")
-        print("  3. Resizes to 480×800 with white padding")
-        print("  4. Converts to grayscale PNG (with dithering by default)")
-        print("  5. Converts PNG to XTC format (fast loading!)")
-        print("  6. Uses multithreading (up to 4 parallel conversions)")
-        print("\nOutput:")
-        print("  - XTC files saved to: ./xtc_output/")
-        print("  - Temp PNGs saved to: ./.temp_png/ (unless --clean)")
-        print("\nExamples:")
-        print("  cbz2xtc                           # Basic conversion (with dithering)")
-        print("  cbz2xtc --clean                   # With cleanup")
-        print("  cbz2xtc --no-dither               # Without dithering")
-        print("  cbz2xtc --contrast 3,5 --margin 5,3.5,5,3.5 --split-spreads all")
-        print("                     # good trial settings for a mainstream comic.")
-        print("  cbz2xtc --dont-split 1            # show cover as single image")
-        print("  cbz2xtc --sideways-overviews --dont-split 17 --select-overviews 19,24")
-        print("                     # A sideways overview will be used instead of splits")
-        print("                     # for page 17, and a sideways overview will come")
-        print("                     # before the splits for pages 19 and 24.")
-        print("  cbz2xtc --overlap --vsplit-target 7 --thumbnail 120 --hsplit-max-width 700")
-        print("                     # Break up the page so it scrolls a little with")
-        print("                     # each advance, showing the currently viewed segment")
-        print("                     # as a highlight on a small thumbnail.")
-        print("  cbz2xtc --overlap --hsplit-count 2 --hsplit-overlap 25 --hsplit-max-width 600")
-        print("                     # split the page horizontally as well as vertically,")
-        print("                     # with a slight overlap, only using 600px screen width on")
-        print("                     # target device for the segmented pieces.")
-        print("  cbz2xtc D:\\manga --clean          # Specific folder + cleanup")
-        return 0
-    
+
+    # Options we don't know are ignored like they always were (the README still
+    # shows some, e.g. --no-split), but say so instead of staying silent.
+    args, unknown = build_arg_parser().parse_known_args()
+    if unknown:
+        print("Warning: ignoring unknown option(s):", " ".join(unknown))
+
     # Parse arguments
     global USE_DITHERING
     global OVERLAP
@@ -760,7 +1107,7 @@ def main():
     global DONT_SPLIT
     global DONT_SPLIT_PAGES
     global CONTRAST_BOOST
-    global CONTRAST_VALUE
+    global CONTRAST_LEVELS
     global MARGIN
     global MARGIN_VALUE
     global INCLUDE_OVERVIEWS
@@ -778,176 +1125,113 @@ def main():
     global SAMPLE_SET
     global SAMPLE_PAGES
     global SPECIAL_SPLITS
-    global SPECIAL_SPLIT_PAGES
-    global SPECIAL_SPLIT_HSPLITS
-    global SPECIAL_SPLIT_VSPLITS
-    global SPECIAL_SPLIT_BOOLEANS
-    global SPECIAL_SPLIT_HOVERLAP
     global SPECIAL_CONTRASTS
-    global SPECIAL_CONTRAST_PAGES
-    global SPECIAL_CONTRAST_DARKS
-    global SPECIAL_CONTRAST_LIGHTS
     global PADDING_COLOR
+    global PNG_COMPRESS_LEVEL
+    global FIXED_CONTRAST_LUT
 
+    clean_temp = args.clean
+    USE_DITHERING = args.use_dithering
+    OVERLAP = args.overlap or args.vsplit_target is not None or args.hsplit_count is not None
+    THUMBNAIL_WIDTH = args.thumbnail
+    THUMBNAIL_HIGHLIGHT_ACTIVE = args.thumb_highlight
+    SPLIT_SPREADS = args.split_spreads is not None
+    SPLIT_SPREADS_PAGES = args.split_spreads or []
+    SPLIT_ALL = args.split_all
+    SKIP_ON = args.skip is not None
+    SKIP_PAGES = args.skip or []
+    ONLY_ON = args.only is not None
+    ONLY_PAGES = args.only or []
+    DONT_SPLIT = args.dont_split is not None
+    DONT_SPLIT_PAGES = args.dont_split or []
+    CONTRAST_BOOST = args.contrast_boost is not None
+    CONTRAST_LEVELS = args.contrast_boost or (0, 0)  # (dark, light), parsed once up front
+    # Fixed levels are the same for every page, so build their LUT just once.
+    FIXED_CONTRAST_LUT = levels_lut(*args.contrast_fixed) if args.contrast_fixed else None
+    MARGIN = args.margin is not None
+    MARGIN_VALUE = args.margin
+    INCLUDE_OVERVIEWS = args.include_overviews
+    SIDEWAYS_OVERVIEWS = args.sideways_overviews
+    SELECT_OVERVIEWS = args.select_overviews is not None
+    SELECT_OV_PAGES = args.select_overviews or []
+    START_PAGE = args.start
+    STOP_PAGE = args.stop
+    IS_MANGA = args.manga
+    SAMPLE_SET = args.sample_set is not None
+    SAMPLE_PAGES = args.sample_set or []
+    # No argparse defaults for these three, so we can tell when they were given
+    MINIMUM_V_OVERLAP_PERCENT = 5 if args.vsplit_min_overlap is None else args.vsplit_min_overlap
+    SET_H_OVERLAP_PERCENT = 70 if args.hsplit_overlap is None else args.hsplit_overlap
+    MAX_SPLIT_WIDTH = 800 if args.hsplit_max_width is None else args.hsplit_max_width
+    PADDING_COLOR = 0 if args.pad_black else 255
+    PNG_COMPRESS_LEVEL = 0 if clean_temp else 1
 
-    clean_temp = "--clean" in sys.argv
-    USE_DITHERING = "--no-dither" not in sys.argv  # Inverted logic
-    OVERLAP = "--overlap" in sys.argv
-    THUMBNAIL_HIGHLIGHT_ACTIVE = "--no-thumb-highlight" not in sys.argv
-    SPLIT_SPREADS = "--split-spreads" in sys.argv
-    SPLIT_ALL = "--split-all" in sys.argv
-    SKIP_ON = "--skip" in sys.argv
-    ONLY_ON = "--only" in sys.argv
-    DONT_SPLIT = "--dont-split" in sys.argv
-    CONTRAST_BOOST = "--contrast-boost" in sys.argv
-    MARGIN = "--margin" in sys.argv or "--margins" in sys.argv # being nice since easy mistake.
-    INCLUDE_OVERVIEWS = "--include-overviews" in sys.argv
-    SIDEWAYS_OVERVIEWS = "--sideways-overviews" in sys.argv
-    SELECT_OVERVIEWS = "--select-overviews" in sys.argv
-    IS_MANGA = "--manga" in sys.argv
-    SPECIAL_SPLITS = "--special-split" in sys.argv
-    SPECIAL_CONTRASTS = "--special-contrast" in sys.argv
-    THUMBNAIL_WIDTH = 0
-    START_PAGE = False
-    STOP_PAGE = False
-    SAMPLE_SET = "--sample-set" in sys.argv
-    SPLIT_SPREADS_PAGES = []
-    SKIP_PAGES = []
-    ONLY_PAGES = []
-    DONT_SPLIT_PAGES = []
-    SELECT_OV_PAGES = []
     DESIRED_V_OVERLAP_SEGMENTS = 0
     SET_H_OVERLAP_SEGMENTS = 0
-    if OVERLAP or "--vsplit-target" in sys.argv or "-hsplit-count" in sys.argv:
+    if OVERLAP:
         # OVERLAP either explicitly or implicitly asked for, and we need real defaults.
         DESIRED_V_OVERLAP_SEGMENTS = 3
         SET_H_OVERLAP_SEGMENTS = 1
-    MINIMUM_V_OVERLAP_PERCENT = 5
-    SET_H_OVERLAP_PERCENT = 70
-    MAX_SPLIT_WIDTH = 800
-    CONTRAST_VALUE = False
-    SPECIAL_SPLIT_PAGES = []
-    SPECIAL_SPLIT_HSPLITS = []
-    SPECIAL_SPLIT_VSPLITS = []
-    SPECIAL_SPLIT_BOOLEANS = []
-    SPECIAL_SPLIT_HOVERLAP = []
-    SPECIAL_CONTRAST_PAGES = []
-    SPECIAL_CONTRAST_DARKS = []
-    SPECIAL_CONTRAST_LIGHTS = []
-    PADDING_COLOR = 255
-
-    if "--pad-black" in sys.argv:
-        PADDING_COLOR = 0
-
-    # args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
-    
-    i = 1
-    args = []
-    while i < len(sys.argv):
-        arg = sys.argv[i]
-        if arg == "--thumbnail":
-            THUMBNAIL_WIDTH = int(sys.argv[i+1])
-            print("Will show thumbnail on splits of width:", THUMBNAIL_WIDTH)
-            # skip the next arg, as it's thumbnail_width pixels parameter.
-            i += 1
-        elif arg == "--split-spreads":
-            SPLIT_SPREADS_PAGES = sys.argv[i+1].split(',')
-            print("Will split spread pages:", SPLIT_SPREADS_PAGES)
-            # skip the next arg, as it's split spread pages parameter.
-            i += 1
-        elif arg == "--skip":
-            SKIP_PAGES = sys.argv[i+1].split(',')
-            print("Will skip pages:", SKIP_PAGES)
-            # skip the next arg, as it's skip pages parameter.
-            i += 1
-        elif arg == "--only":
-            ONLY_PAGES = sys.argv[i+1].split(',')
-            print("Will only do pages:", ONLY_PAGES)
-            i += 1 #skip next arg
-        elif arg == "--dont-split":
-            DONT_SPLIT_PAGES = sys.argv[i+1].split(',')
-            print("Will not split pages:", DONT_SPLIT_PAGES)
-            i += 1 #skip next arg
-        elif arg == "--contrast-boost":
-            CONTRAST_VALUE = sys.argv[i+1]
-            print("Contrast setting:", CONTRAST_VALUE)
-            i += 1 #skip next arg
-        elif arg == "--margin" or arg== "--margins":
-            MARGIN_VALUE = sys.argv[i+1]
-            print("Margin setting:", MARGIN_VALUE)
-            i += 1 #skip next arg
-        elif arg == "--select-overviews":
-            SELECT_OV_PAGES = sys.argv[i+1].split(',')
-            print("Overviews will be added for pages:", SELECT_OV_PAGES)
-            i += 1 #skip next arg
-        elif arg == "--start":
-            START_PAGE = int(sys.argv[i+1])
-            print("Generation will start at page:", START_PAGE)
-            i += 1 #skip next arg
-        elif arg == "--stop":
-            STOP_PAGE = int(sys.argv[i+1])
-            print("Generation will stop after page:", STOP_PAGE)
-            i += 1 #skip next arg
-        elif arg == "--vsplit-target":
-            OVERLAP = True  # even if not explicitly set.
-            DESIRED_V_OVERLAP_SEGMENTS = int(sys.argv[i+1])
-            print("will try to verticallly split into ", DESIRED_V_OVERLAP_SEGMENTS, "segments")
-            i += 1 #skip next arg
-        elif arg == "--vsplit-min-overlap":
-            MINIMUM_V_OVERLAP_PERCENT = float(sys.argv[i+1])
-            print("Minimum percentage overlap for vertical splits:", MINIMUM_V_OVERLAP_PERCENT)
-            i += 1 #skip next arg
-        elif arg == "--hsplit-count":
-            OVERLAP = True    # even if not explicitly set.
-            SET_H_OVERLAP_SEGMENTS = int(sys.argv[i+1])
-            print("will horizontally split into ", SET_H_OVERLAP_SEGMENTS, "segments")
-            i += 1 #skip next arg
-        elif arg == "--hsplit-overlap":
-            SET_H_OVERLAP_PERCENT = float(sys.argv[i+1])
-            print("will do this percentage overlap for horizontal splits:", SET_H_OVERLAP_PERCENT)
-            i += 1 #skip next arg
-        elif arg == "--hsplit-max-width":
-            MAX_SPLIT_WIDTH = int(sys.argv[i+1])
-            print("max width in pixels for horizontal splits:", MAX_SPLIT_WIDTH)
-            i += 1 #skip next arg
-        elif arg == "--sample-set":
-            SAMPLE_PAGES = sys.argv[i+1].split(',')
-            print("Sample Mode for pages:", SAMPLE_PAGES)
-            i += 1 #skip next arg
-        elif arg == "--special-split":
-            specifiers = sys.argv[i+1].split(',')
-            for specifier in specifiers:
-                SPECIAL_SPLIT_PAGES.append(int(specifier.split('-')[0]))
-                SPECIAL_SPLIT_HSPLITS.append(int(specifier.split('-')[1]))
-                SPECIAL_SPLIT_VSPLITS.append(int(specifier.split('-')[2]))
-                if len(specifier.split('-'))>3:
-                    SPECIAL_SPLIT_BOOLEANS.append(list(specifier.split('-')[3]))
-                else:
-                    SPECIAL_SPLIT_BOOLEANS.append('');
-                if len(specifier.split('-'))>4:
-                    SPECIAL_SPLIT_HOVERLAP.append(int(specifier.split('-')[4]))
-                else:
-                    SPECIAL_SPLIT_HOVERLAP.append(SET_H_OVERLAP_PERCENT)
-            print("special-split specifier pages:", SPECIAL_SPLIT_PAGES)
-            print("special-split specifier booleans:", SPECIAL_SPLIT_BOOLEANS)
-            i += 1 #skip next arg
-        elif arg == "--special-contrast":
-            specifiers = sys.argv[i+1].split(',')
-            for specifier in specifiers:
-                SPECIAL_CONTRAST_PAGES.append(int(specifier.split('-')[0]))
-                SPECIAL_CONTRAST_DARKS.append(int(specifier.split('-')[1]))
-                SPECIAL_CONTRAST_LIGHTS.append(int(specifier.split('-')[2]))
-            print("special-contrast specifier pages:", SPECIAL_CONTRAST_PAGES)
-            i += 1 #skip next arg
-        elif arg.startswith("--"):
-            pass # do nothing, it's presumably boolean and handled above.
-        else:
-            args.append(arg) # it's supposed to be a path.
-        i += 1
+    if args.vsplit_target is not None:
+        DESIRED_V_OVERLAP_SEGMENTS = args.vsplit_target
+    if args.hsplit_count is not None:
+        SET_H_OVERLAP_SEGMENTS = args.hsplit_count
+
+    # Per-page overrides, keyed by page number for direct lookup.
+    SPECIAL_SPLITS = {}
+    for page, hsplits, vsplits, booleans, hoverlap in args.special_split or []:
+        if hoverlap is None:
+            hoverlap = SET_H_OVERLAP_PERCENT
+        SPECIAL_SPLITS[page] = (hsplits, vsplits, booleans, hoverlap)
+
+    SPECIAL_CONTRASTS = {}
+    for page, dark, light in args.special_contrast or []:
+        SPECIAL_CONTRASTS[page] = (dark, light)
+
+    # Echo the non-default settings back to the user
+    if THUMBNAIL_WIDTH:
+        print("Will show thumbnail on splits of width:", THUMBNAIL_WIDTH)
+    if SPLIT_SPREADS:
+        print("Will split spread pages:", SPLIT_SPREADS_PAGES)
+    if SKIP_ON:
+        print("Will skip pages:", SKIP_PAGES)
+    if ONLY_ON:
+        print("Will only do pages:", ONLY_PAGES)
+    if DONT_SPLIT:
+        print("Will not split pages:", DONT_SPLIT_PAGES)
+    if CONTRAST_BOOST:
+        print("Contrast setting:", ",".join(str(level) for level in CONTRAST_LEVELS))
+    if FIXED_CONTRAST_LUT:
+        print("Fixed contrast levels:", args.contrast_fixed)
+    if MARGIN:
+        print("Margin setting:", MARGIN_VALUE)
+    if SELECT_OVERVIEWS:
+        print("Overviews will be added for pages:", SELECT_OV_PAGES)
+    if START_PAGE:
+        print("Generation will start at page:", START_PAGE)
+    if STOP_PAGE:
+        print("Generation will stop after page:", STOP_PAGE)
+    if args.vsplit_target is not None:
+        print("will try to verticallly split into ", DESIRED_V_OVERLAP_SEGMENTS, "segments")
+    if args.vsplit_min_overlap is not None:
+        print("Minimum percentage overlap for vertical splits:", MINIMUM_V_OVERLAP_PERCENT)
+    if args.hsplit_count is not None:
+        print("will horizontally split into ", SET_H_OVERLAP_SEGMENTS, "segments")
+    if args.hsplit_overlap is not None:
+        print("will do this percentage overlap for horizontal splits:", SET_H_OVERLAP_PERCENT)
+    if args.hsplit_max_width is not None:
+        print("max width in pixels for horizontal splits:", MAX_SPLIT_WIDTH)
+    if SAMPLE_SET:
+        print("Sample Mode for pages:", SAMPLE_PAGES)
+    if SPECIAL_SPLITS:
+        print("special-split specifier pages:", list(SPECIAL_SPLITS))
+        print("special-split specifier booleans:", [split[2] for split in SPECIAL_SPLITS.values()])
+    if SPECIAL_CONTRASTS:
+        print("special-contrast specifier pages:", list(SPECIAL_CONTRASTS))
 
     # Get input directory
-    if args:
-        input_dir = Path(args[0])
+    if args.input_dir:
+        input_dir = Path(args.input_dir)
     else:
         input_dir = Path.cwd()
     
@@ -962,8 +1246,13 @@ def main():
         print("Dithering: DISABLED (use --dither to enable)")
     
     # Determine number of threads
-    max_workers = min(4, os.cpu_count() or 1)  # Use up to 4 threads
+    cpus = usable_cpu_count()
+    max_workers = min(4, cpus)  # Use up to 4 threads
     print(f"Threads: {max_workers} (parallel processing)")
+    # Page conversion is CPU bound, so it runs in a process pool shared by all files
+    page_workers = cpus
+    print(f"Page workers: {page_workers} processes")
+    print(f"Pillow: {PIL.__version__}")
     
     # Create output and temp directories
     output_dir = input_dir / "xtc_output"
@@ -976,18 +1265,20 @@ def main():
     cbz_files = []
     
     # Check current directory
-    cbz_files.extend(sorted(input_dir.glob("*.cbz")))
-    cbz_files.extend(sorted(input_dir.glob("*.CBZ")))
+    found, subdirs = scan_for_cbz(input_dir)
+    cbz_files.extend(found)
     
     # Only check subdirectories if no CBZ files found in current directory
     if not cbz_files:
-        for subdir in input_dir.iterdir():
-            if subdir.is_dir() and subdir.name not in ["xtc_output", ".temp_png"]:
-                cbz_files.extend(sorted(subdir.glob("*.cbz")))
-                cbz_files.extend(sorted(subdir.glob("*.CBZ")))
+        for subdir in subdirs:
+            if subdir.name not in ["xtc_output", ".temp_png"]:
+                cbz_files.extend(scan_for_cbz(subdir)[0])
     
-    # Remove any duplicates (shouldn't happen now, but just in case)
-    cbz_files = list(dict.fromkeys(cbz_files))
+    # No dedup needed: scandir yields each directory entry exactly once,
+    # and the .cbz/.CBZ match is a single case-insensitive test.
+
+    # Largest files first, so a big volume doesn't end up running alone at the end
+    cbz_files.sort(key=lambda p: p.stat().st_size, reverse=True)
     
     if not cbz_files:
         print(f"\nNo CBZ files found in '{input_dir}' or its subdirectories")
@@ -1050,29 +1341,54 @@ def main():
     
     print(f"Using png2xtc.py from: {png2xtc_path.parent}")
     
-    # Process files with multithreading
-    start_time = time.time()
+    # Process files with multithreading, page work in worker processes
+    start_time = time.perf_counter()
     success_count = 0
     total_time = 0
     
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_cbz = {
-            executor.submit(process_cbz_file, cbz_file, output_dir, temp_dir, clean_temp, idx, len(cbz_files)): cbz_file
-            for idx, cbz_file in enumerate(cbz_files, 1)
-        }
-        
-        # Process results as they complete
-        for future in as_completed(future_to_cbz):
-            success, filename, elapsed = future.result()
-            if success:
-                success_count += 1
-                total_time += elapsed
-                avg_time = total_time / success_count
-                remaining = (len(cbz_files) - success_count) * avg_time
-                print(f"  ⏱  {elapsed:.1f}s | Est. remaining: {remaining/60:.1f}min")
+    # Spawned, not forked: workers start on the first submit() from a book thread,
+    # and a fork there could copy a print lock that another thread is holding.
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=page_workers, mp_context=spawn, initializer=apply_settings, initargs=(current_settings(),)) as page_pool, \
+         ThreadPoolExecutor(max_workers=max_workers) as executor, \
+         ThreadPoolExecutor(max_workers=max_workers) as converter, \
+         ThreadPoolExecutor(max_workers=2) as cleaner:
+        # Two stages: executor threads extract books, converter threads turn them into XTC,
+        # so the next book's extraction overlaps the previous one's conversion.
+        # Books are fed in as others finish, so extracted PNGs can't pile up on disk.
+        # With --clean, the cleaner threads delete each book's PNGs in the background.
+        books = enumerate(cbz_files, 1)
+        books_in_flight = 2 * max_workers
+        extracting = {}
+        converting = set()
+        while True:
+            while len(extracting) + len(converting) < books_in_flight:
+                idx, cbz_file = next(books, (None, None))
+                if cbz_file is None:
+                    break
+                extracting[executor.submit(start_cbz_file, cbz_file, temp_dir, idx, len(cbz_files), page_pool)] = cbz_file
+            if not extracting and not converting:
+                break
+
+            done, _ = wait(list(extracting) + list(converting), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in extracting:
+                    cbz_file = extracting.pop(future)
+                    png_folder, book_start = future.result()
+                    if png_folder:
+                        converting.add(converter.submit(finish_cbz_file, cbz_file, png_folder, output_dir, clean_temp, book_start, png2xtc_path, cleaner))
+                    continue
+
+                converting.remove(future)
+                success, filename, elapsed = future.result()
+                if success:
+                    success_count += 1
+                    total_time += elapsed
+                    avg_time = total_time / success_count
+                    remaining = (len(cbz_files) - success_count) * avg_time
+                    report(f"  ⏱  {elapsed:.1f}s | Est. remaining: {remaining/60:.1f}min")
     
-    elapsed_total = time.time() - start_time
+    elapsed_total = time.perf_counter() - start_time
     
     print("-" * 60)
     print(f"\nCompleted! Successfully converted {success_count}/{len(cbz_files)} files")
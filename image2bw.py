@@ -8,6 +8,7 @@ Usage:
     image2bw image.jpg --no-dither           # Pure threshold (sharpest text)
     image2bw image.jpg --dither ordered      # Ordered dithering (grid pattern)
     image2bw image.jpg --dither rasterize    # Rasterize (halftone-like)
+    image2bw image.jpg --linear              # Floyd-Steinberg in linear light
     image2bw folder/                         # Convert all images in folder
 
 Dithering algorithms:
@@ -19,16 +20,67 @@ Dithering algorithms:
 Note: Always outputs BMP format (XTEink X4 doesn't support PNG images)
 """
 
+import os
+import struct
 import sys
 from pathlib import Path
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+import PIL
+from PIL import Image, ImageChops
 
 
 # Configuration
 TARGET_WIDTH = 480
 TARGET_HEIGHT = 800
+
+# Downscale filter. Output is 1-bit, so LANCZOS' extra sharpness is lost in the
+# dither anyway; HAMMING's narrower kernel does about a third of the work.
+RESAMPLE_FILTER = Image.Resampling.HAMMING
+
+# Big downscales first shrink by an integer factor with a fast box reduce(),
+# leaving at least this much scaling for the RESAMPLE_FILTER pass (see Image.resize)
+REDUCING_GAP = 3.0
+
 SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.webp', '.tiff', '.tif'}
 
+# Every output is a 480x800 1-bit BMP, so its headers never change:
+# BITMAPFILEHEADER + BITMAPINFOHEADER (bottom-up rows, 3780 px/m = 96 dpi)
+# and a black/white palette. Rows are 480 bits = 60 bytes, already 4-byte aligned.
+BMP_ROW_BYTES = TARGET_WIDTH // 8
+BMP_IMAGE_BYTES = BMP_ROW_BYTES * TARGET_HEIGHT
+BMP_HEADER = (
+    struct.pack('<2sIHHI', b'BM', 62 + BMP_IMAGE_BYTES, 0, 0, 62)
+    + struct.pack('<IiiHHIIiiII', 40, TARGET_WIDTH, TARGET_HEIGHT, 1, 1, 0,
+                  BMP_IMAGE_BYTES, 3780, 3780, 2, 2)
+    + b'\x00\x00\x00\x00\xff\xff\xff\x00'
+)
+
+# Folders with fewer images than this are converted one by one;
+# starting worker processes isn't worth it for a couple of files.
+PARALLEL_MIN_FILES = 4
+
+# --linear: sRGB (gamma ~2.2) to linear light, so Floyd-Steinberg spreads error in
+# actual brightness and mid-tones get the right share of white dots
+SRGB_TO_LINEAR = [round((v / 255) ** 2.2 * 255) for v in range(256)]
+
+# Standard 8x8 Bayer matrix (ranks 0-63) for ordered dithering
+BAYER_8X8 = [
+    [ 0, 32,  8, 40,  2, 34, 10, 42],
+    [48, 16, 56, 24, 50, 18, 58, 26],
+    [12, 44,  4, 36, 14, 46,  6, 38],
+    [60, 28, 52, 20, 62, 30, 54, 22],
+    [ 3, 35, 11, 43,  1, 33,  9, 41],
+    [51, 19, 59, 27, 49, 17, 57, 25],
+    [15, 47,  7, 39, 13, 45,  5, 37],
+    [63, 31, 55, 23, 61, 29, 53, 21],
+]
+
+# Reusable white 480x800 background (see get_canvas)
+_canvas = None
+
+# Tiled threshold images per dither algorithm, built on first use (see get_screen)
+_screens = {}
+
 # Dithering algorithm descriptions
 DITHER_ALGORITHMS = {
     'floyd': {
@@ -37,7 +89,10 @@ DITHER_ALGORITHMS = {
     },
     'ordered': {
         'mode': Image.Dither.ORDERED,
-        'desc': 'Ordered/Bayer dithering - grid pattern, often better for text'
+        'desc': 'Ordered/Bayer dithering - grid pattern, often better for text',
+        # Pillow's convert('1') falls back to Floyd-Steinberg for ORDERED,
+        # so this one compares against a tiled Bayer matrix instead
+        'screen': BAYER_8X8
     },
     'rasterize': {
         'mode': Image.Dither.RASTERIZE,
@@ -50,22 +105,74 @@ DITHER_ALGORITHMS = {
 }
 
 
-def convert_to_bw(input_path, dither_algo='floyd'):
+def threshold_screen(matrix):
+    """
+    Tile an 8x8 rank matrix (0-63) into a 480x800 'L' image of gray thresholds
+    """
+    rows = [bytes(int((rank + 0.5) * 4) for rank in row) * (TARGET_WIDTH // 8) for row in matrix]
+    return Image.frombytes('L', (TARGET_WIDTH, TARGET_HEIGHT), b''.join(rows) * (TARGET_HEIGHT // 8))
+
+
+def get_screen(dither_algo):
+    """
+    Return the 480x800 threshold screen for dither_algo, built once per process
+    """
+    screen = _screens.get(dither_algo)
+    if screen is None:
+        screen = _screens[dither_algo] = threshold_screen(DITHER_ALGORITHMS[dither_algo]['screen'])
+    return screen
+
+
+def threshold_dither(img, screen):
+    """
+    Ordered dither: 1-bit image that is white wherever img is brighter than screen
+    One subtract (clipped at 0) and one LUT to mode '1', both in C.
+    """
+    return ImageChops.subtract(img, screen).point([0] + [255] * 255, '1')
+
+
+def get_canvas():
+    """
+    Return this process's 480x800 'L' background, refilled with white
+    Saves allocating a fresh screen-sized image for every file in a batch.
+    """
+    global _canvas
+    if _canvas is None:
+        _canvas = Image.new('L', (TARGET_WIDTH, TARGET_HEIGHT), color=255)
+    else:
+        _canvas.paste(255, (0, 0, TARGET_WIDTH, TARGET_HEIGHT))
+    return _canvas
+
+
+def save_bw_bmp(bw_img, output_path):
+    """
+    Write a 480x800 mode '1' image as BMP using the fixed BMP_HEADER
+    Same bytes as bw_img.save(output_path, 'BMP'), in a single write.
+    Returns the file size.
+    """
+    # BMP stores rows bottom-up; mode '1' tobytes() is already 1 bit per pixel, MSB first
+    data = BMP_HEADER + bw_img.transpose(Image.Transpose.FLIP_TOP_BOTTOM).tobytes()
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def convert_to_bw(input_path, dither_algo='floyd', label='', linear=False):
     """
     Convert image to 1-bit black & white BMP
     
     Args:
         input_path: Path to input image
         dither_algo: 'floyd', 'ordered', 'rasterize', or 'none'
+        label: Text to start the result line with (e.g. the input name)
+        linear: Floyd-Steinberg in linear light instead of on the sRGB values
     
     Returns:
         Output file path or None if failed
     """
     try:
-        # Open and convert to grayscale
+        # Open (only the header is read at this point)
         img = Image.open(input_path)
-        if img.mode != 'L':
-            img = img.convert('L')
         
         # Resize to fit screen while maintaining aspect ratio
         img_width, img_height = img.size
@@ -74,10 +181,23 @@ def convert_to_bw(input_path, dither_algo='floyd'):
         new_width = int(img_width * scale)
         new_height = int(img_height * scale)
         
-        img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+        # JPEGs can be decoded straight to grayscale and at 1/2, 1/4 or 1/8 size.
+        # Ask for at least twice the final size so the resize still has detail to work with.
+        # Other formats ignore this.
+        img.draft('L', (new_width * 2, new_height * 2))
         
-        # Create white background
-        result = Image.new('L', (TARGET_WIDTH, TARGET_HEIGHT), color=255)
+        # Convert to grayscale
+        if img.mode != 'L':
+            img = img.convert('L')
+        
+        if (new_width, new_height) == img.size:
+            # Already screen-sized (e.g. made for the X4), nothing to resample
+            img_resized = img
+        else:
+            img_resized = img.resize((new_width, new_height), RESAMPLE_FILTER, reducing_gap=REDUCING_GAP)
+        
+        # White background, reused from the previous image
+        result = get_canvas()
         
         # Center the image
         x = (TARGET_WIDTH - new_width) // 2
@@ -87,23 +207,26 @@ def convert_to_bw(input_path, dither_algo='floyd'):
         
         # Convert to 1-bit B&W with selected algorithm
         dither_mode = DITHER_ALGORITHMS[dither_algo]['mode']
-        bw_img = result.convert('1', dither=dither_mode)
+        if linear and dither_algo == 'floyd':
+            # one LUT pass, no per-pixel math
+            result = result.point(SRGB_TO_LINEAR)
+        if 'screen' in DITHER_ALGORITHMS[dither_algo]:
+            bw_img = threshold_dither(result, get_screen(dither_algo))
+        else:
+            bw_img = result.convert('1', dither=dither_mode)
         
         # Generate output filename (always BMP)
         output_name = f"{input_path.stem}_bw_{dither_algo}.bmp"
         output_path = input_path.parent / output_name
         
-        # Save as BMP
-        bw_img.save(output_path, 'BMP')
+        # Save as BMP (also gives us the file size without a stat())
+        size_kb = save_bw_bmp(bw_img, output_path) / 1024
         
-        # Get file size
-        size_kb = output_path.stat().st_size / 1024
-        
-        print(f"  ✓ {output_path.name} ({size_kb:.1f}KB)")
+        print(f"{label}  ✓ {output_path.name} ({size_kb:.1f}KB)")
         return output_path
         
     except Exception as e:
-        print(f"  ✗ Error: {e}")
+        print(f"{label}  ✗ Error: {e}")
         return None
 
 
@@ -120,6 +243,7 @@ def main():
         print("  image2bw image.jpg                      # Default (Floyd-Steinberg)")
         print("  image2bw image.jpg --dither ordered     # Use ordered dithering")
         print("  image2bw image.jpg --dither none        # No dithering (sharpest)")
+        print("  image2bw image.jpg --linear             # Floyd-Steinberg in linear light")
         print("  image2bw folder/                        # Convert all images")
         print("\nDithering algorithms:")
         for algo, info in DITHER_ALGORITHMS.items():
@@ -144,6 +268,7 @@ def main():
                 print(f"Warning: Unknown algorithm '{specified_algo}', using 'floyd'")
     elif '--no-dither' in args:
         dither_algo = 'none'
+    linear = '--linear' in args
     
     # Get input path
     input_path = None
@@ -159,24 +284,37 @@ def main():
     print(f"\nInput: {input_path.absolute()}")
     print(f"Output format: BMP (1-bit black & white)")
     print(f"Dithering: {dither_algo.upper()} - {DITHER_ALGORITHMS[dither_algo]['desc']}")
+    if linear and dither_algo == 'floyd':
+        print("Linear light: on (truer mid-tones, darker overall)")
     print(f"Target size: 480x800 pixels")
+    print(f"Pillow: {PIL.__version__}")
     print("-" * 60)
     
     # Process based on input type
     if input_path.is_file():
         # Single file
         print(f"\nProcessing: {input_path.name}")
-        result = convert_to_bw(input_path, dither_algo)
+        result = convert_to_bw(input_path, dither_algo, linear=linear)
         success_count = 1 if result else 0
         total_count = 1
     else:
         # Folder
-        image_files = []
-        for ext in SUPPORTED_FORMATS:
-            image_files.extend(sorted(input_path.glob(f"*{ext}")))
-            image_files.extend(sorted(input_path.glob(f"*{ext.upper()}")))
-        
-        image_files = sorted(set(image_files), key=lambda x: x.name.lower())
+        # One pass over the folder; extensions match in any case.
+        # Dot files are left out, as glob("*") used to (e.g. macOS "._" files).
+        with os.scandir(input_path) as entries:
+            image_entries = [entry for entry in entries
+                             if not entry.name.startswith('.')
+                             and os.path.splitext(entry.name)[1].lower() in SUPPORTED_FORMATS
+                             and entry.is_file()]
+        # Output names come from the input names, so the order is free.
+        # Inode order roughly follows where files sit on disk, which helps readahead
+        # on spinning disks and SD cards; scandir has it without a stat() on POSIX.
+        # (On Windows inode() costs a stat per file, so stay with name order there.)
+        if os.name == 'nt':
+            image_entries.sort(key=lambda entry: entry.name.lower())
+        else:
+            image_entries.sort(key=lambda entry: entry.inode())
+        image_files = [Path(entry.path) for entry in image_entries]
         
         if not image_files:
             print(f"No image files found in {input_path}")
@@ -185,11 +323,22 @@ def main():
         print(f"\nFound {len(image_files)} image(s)")
         print("Processing...\n")
         
-        success_count = 0
-        for img_path in image_files:
-            print(f"{img_path.name}...", end=" ")
-            if convert_to_bw(img_path, dither_algo):
-                success_count += 1
+        # Each result line starts with its file name, printed in one go,
+        # so lines from parallel workers don't get mixed up.
+        labels = [f"{img_path.name}... " for img_path in image_files]
+        algos = [dither_algo] * len(image_files)
+        linears = [linear] * len(image_files)
+        if len(image_files) < PARALLEL_MIN_FILES:
+            results = list(map(convert_to_bw, image_files, algos, labels, linears))
+        else:
+            # Every image is independent, so convert them on all cores.
+            # One pool for the whole batch; hand each worker about four chunks,
+            # so big folders don't pay a round trip per image.
+            workers = os.cpu_count() or 1
+            chunksize = max(1, len(image_files) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(convert_to_bw, image_files, algos, labels, linears, chunksize=chunksize))
+        success_count = sum(1 for result in results if result)
         
         total_count = len(image_files)
     